@@ -0,0 +1,390 @@
+import queue
+import time
+import traceback
+from collections import deque
+
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+from torch.nn import functional as F
+from stable_baselines3.common.utils import configure_logger
+
+# Info keys forwarded from the actors to the learner-side callbacks.
+# Only plain scalars travel through the queue (MetaDrive info can hold engine objects).
+_SCALAR_TYPES = (bool, int, float, np.bool_, np.integer, np.floating)
+
+
+def _frozen_lr(_progress_remaining):
+    """
+    Actors never optimize, so their policy copy gets a picklable dummy schedule.
+    """
+    return 0.0
+
+
+def _scalar_info(info):
+    return {k: v for k, v in info.items() if isinstance(v, _SCALAR_TYPES)}
+
+
+def collect_unroll(env, policy, obs, unroll_length, episode):
+    """
+    Steps `env` for `unroll_length` steps with `policy`, starting from `obs`.
+    `episode` holds the running {"r", "l", "start"} stats and is updated in place.
+    Returns the unroll (T steps + bootstrap observation) and the next observation.
+    """
+    obs_buf = {k: [] for k in obs}
+    actions, rewards, dones, log_probs, infos, episodes = [], [], [], [], [], []
+    for _ in range(unroll_length):
+        for k, v in obs.items():
+            obs_buf[k].append(v)
+        with torch.no_grad():
+            obs_tensor, _ = policy.obs_to_tensor(obs)
+            action, _, log_prob = policy(obs_tensor)
+        action = action.cpu().numpy()[0]
+        clipped = np.clip(action, env.action_space.low, env.action_space.high)
+
+        obs, reward, terminated, truncated, info = env.step(clipped)
+        done = terminated or truncated
+        episode["r"] += float(reward)
+        episode["l"] += 1
+
+        actions.append(action)
+        rewards.append(reward)
+        dones.append(done)
+        log_probs.append(log_prob.item())
+        infos.append(_scalar_info(info))
+
+        if done:
+            episodes.append({"r": episode["r"], "l": episode["l"], "t": round(time.time() - episode["start"], 6)})
+            obs, _ = env.reset()
+            episode.update(r=0.0, l=0, start=time.time())
+
+    for k, v in obs.items():
+        obs_buf[k].append(v)
+
+    unroll = {
+        "obs": {k: np.stack(v) for k, v in obs_buf.items()},
+        "actions": np.asarray(actions, dtype=np.float32),
+        "rewards": np.asarray(rewards, dtype=np.float32),
+        "dones": np.asarray(dones, dtype=np.float32),
+        "log_probs": np.asarray(log_probs, dtype=np.float32),
+        "infos": infos,
+        "episodes": episodes,
+    }
+    return unroll, obs
+
+
+def _actor_loop(actor_id, map_type, env_kwargs, policy_class, policy_kwargs, shared_state, state_lock,
+                policy_version, traj_queue, stop_event, unroll_length):
+    """
+    Actor process: steps its own SensorFusionEnv with a periodically refreshed
+    copy of the policy and pushes fixed-length unrolls into the bounded queue.
+    """
+    # Imported here so each spawned process builds its own MetaDrive engine
+    from env_wrapper import make_env
+
+    torch.set_num_threads(1)
+    env = None
+    try:
+        env = make_env(render=False, map_type=map_type, **env_kwargs)
+        policy = policy_class(**policy_kwargs)
+        policy.set_training_mode(False)
+        local_version = -1
+
+        obs, _ = env.reset()
+        episode = {"r": 0.0, "l": 0, "start": time.time()}
+        busy_time, wait_time = 0.0, 0.0
+
+        while not stop_event.is_set():
+            t_start = time.perf_counter()
+
+            # 1. Refresh the local policy if the learner published new weights
+            if policy_version.value != local_version:
+                with state_lock:
+                    local_version = policy_version.value
+                    policy.load_state_dict(shared_state)
+
+            # 2. Collect one unroll (T steps + bootstrap observation)
+            trajectory, obs = collect_unroll(env, policy, obs, unroll_length, episode)
+            busy_time += time.perf_counter() - t_start
+            trajectory.update(
+                actor_id=actor_id,
+                policy_version=local_version,
+                busy_time=busy_time,
+                wait_time=wait_time,
+            )
+
+            # 3. Hand off to the learner; blocking here means the learner is the bottleneck
+            t_wait = time.perf_counter()
+            while not stop_event.is_set():
+                try:
+                    traj_queue.put(trajectory, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+            wait_time += time.perf_counter() - t_wait
+    except Exception:
+        try:
+            traj_queue.put({"actor_id": actor_id, "error": traceback.format_exc()}, timeout=5.0)
+        except queue.Full:
+            pass
+    finally:
+        if env is not None:
+            env.close()
+
+
+def vtrace(behaviour_log_probs, target_log_probs, rewards, values, bootstrap_value, dones,
+           gamma, rho_bar=1.0, c_bar=1.0):
+    """
+    V-trace targets and policy-gradient advantages (Espeholt et al., 2018).
+    All inputs are (T, B) tensors except bootstrap_value, which is (B,).
+    """
+    with torch.no_grad():
+        rhos = torch.exp(target_log_probs - behaviour_log_probs)
+        clipped_rhos = torch.clamp(rhos, max=rho_bar)
+        cs = torch.clamp(rhos, max=c_bar)
+        discounts = gamma * (1.0 - dones)
+
+        values_tp1 = torch.cat([values[1:], bootstrap_value.unsqueeze(0)], dim=0)
+        deltas = clipped_rhos * (rewards + discounts * values_tp1 - values)
+
+        acc = torch.zeros_like(bootstrap_value)
+        vs_minus_v = []
+        for t in reversed(range(rewards.shape[0])):
+            acc = deltas[t] + discounts[t] * cs[t] * acc
+            vs_minus_v.append(acc)
+        vs = torch.stack(vs_minus_v[::-1]) + values
+
+        vs_tp1 = torch.cat([vs[1:], bootstrap_value.unsqueeze(0)], dim=0)
+        pg_advantages = clipped_rhos * (rewards + discounts * vs_tp1 - values)
+    return vs, pg_advantages
+
+
+class AsyncActorLearner:
+    """
+    IMPALA-style asynchronous trainer around an existing PPO model.
+    Actors step the simulator continuously while the learner updates the
+    shared policy with V-trace off-policy correction. The PPO model is only
+    used as a container (policy, optimizer, logger, callbacks, save/load),
+    so checkpoints remain loadable with agent_logic.load_agent.
+    """
+    def __init__(self, model, num_actors=4, unroll_length=64, batch_size=4, queue_size=8,
+                 sync_interval=1, rho_bar=1.0, c_bar=1.0, log_interval=10, verbose=1):
+        self.model = model
+        self.num_actors = num_actors
+        self.unroll_length = unroll_length
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.sync_interval = sync_interval
+        self.rho_bar = rho_bar
+        self.c_bar = c_bar
+        self.log_interval = log_interval
+        self.verbose = verbose
+
+        # Spawn (not fork): MetaDrive/Panda3D state must never be inherited
+        self._ctx = mp.get_context("spawn")
+        self._policy_kwargs = model.policy._get_constructor_parameters()
+        self._policy_kwargs["lr_schedule"] = _frozen_lr
+        self._shared_state = {k: v.detach().cpu().clone().share_memory_()
+                              for k, v in model.policy.state_dict().items()}
+        self._state_lock = self._ctx.Lock()
+        self._policy_version = self._ctx.Value("i", 0)
+        self._n_updates = 0
+        self._reset_utilization()
+
+    def _reset_utilization(self):
+        self._learner_busy = 0.0
+        self._learner_wait = 0.0
+        self._actor_times = {}
+        self._policy_lag = deque(maxlen=100)
+
+    def _publish_policy(self):
+        with self._state_lock:
+            for k, v in self.model.policy.state_dict().items():
+                self._shared_state[k].copy_(v.detach().cpu())
+            self._policy_version.value += 1
+
+    def _start_actors(self, map_type, env_kwargs):
+        self._stop_event = self._ctx.Event()
+        self._traj_queue = self._ctx.Queue(maxsize=self.queue_size)
+        self._actors = []
+        for actor_id in range(self.num_actors):
+            p = self._ctx.Process(
+                target=_actor_loop,
+                args=(actor_id, map_type, env_kwargs, type(self.model.policy), self._policy_kwargs,
+                      self._shared_state, self._state_lock, self._policy_version,
+                      self._traj_queue, self._stop_event, self.unroll_length),
+                daemon=True,
+            )
+            p.start()
+            self._actors.append(p)
+
+    def _stop_actors(self):
+        self._stop_event.set()
+        # Drain so that actors blocked on a full queue can exit
+        deadline = time.time() + 10.0
+        while any(p.is_alive() for p in self._actors) and time.time() < deadline:
+            try:
+                self._traj_queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        for p in self._actors:
+            p.join(timeout=1.0)
+            if p.is_alive():
+                p.terminate()
+        self._actors = []
+
+    def _next_trajectory(self):
+        while True:
+            try:
+                trajectory = self._traj_queue.get(timeout=1.0)
+            except queue.Empty:
+                if not any(p.is_alive() for p in self._actors):
+                    raise RuntimeError("All actor processes exited without producing data.")
+                continue
+            if "error" in trajectory:
+                raise RuntimeError(f"Actor {trajectory['actor_id']} crashed:\n{trajectory['error']}")
+            return trajectory
+
+    def _update(self, batch):
+        """
+        One V-trace actor-critic gradient step on a batch of B unrolls.
+        """
+        model = self.model
+        policy = model.policy
+        policy.set_training_mode(True)
+        T, B = self.unroll_length, len(batch)
+
+        obs = {k: np.concatenate([traj["obs"][k][:-1] for traj in batch]) for k in batch[0]["obs"]}
+        last_obs = {k: np.stack([traj["obs"][k][-1] for traj in batch]) for k in batch[0]["obs"]}
+        # Actors queue raw (channel-last) env observations; obs_to_tensor applies the
+        # same image transpose as the VecTransposeImage wrapper the model was built with
+        obs, _ = policy.obs_to_tensor(obs)
+        last_obs, _ = policy.obs_to_tensor(last_obs)
+
+        def stack(key):
+            # (B*T) flattened in trajectory-major order -> (T, B)
+            return torch.as_tensor(np.stack([traj[key] for traj in batch], axis=1), device=model.device)
+
+        actions = torch.as_tensor(np.concatenate([traj["actions"] for traj in batch]), device=model.device)
+        rewards, dones, behaviour_log_probs = stack("rewards"), stack("dones"), stack("log_probs")
+
+        values, log_probs, entropy = policy.evaluate_actions(obs, actions)
+        values = values.flatten().view(B, T).t()
+        log_probs = log_probs.view(B, T).t()
+        with torch.no_grad():
+            bootstrap_value = policy.predict_values(last_obs).flatten()
+
+        vs, pg_advantages = vtrace(behaviour_log_probs, log_probs.detach(), rewards, values.detach(),
+                                   bootstrap_value, dones, model.gamma, self.rho_bar, self.c_bar)
+
+        policy_loss = -(pg_advantages * log_probs).mean()
+        value_loss = F.mse_loss(values, vs)
+        entropy_loss = -torch.mean(entropy) if entropy is not None else -torch.mean(-log_probs)
+        loss = policy_loss + model.vf_coef * value_loss + model.ent_coef * entropy_loss
+
+        policy.optimizer.zero_grad()
+        loss.backward()
+        torch.nn.utils.clip_grad_norm_(policy.parameters(), model.max_grad_norm)
+        policy.optimizer.step()
+
+        self._n_updates += 1
+        if self._n_updates % self.sync_interval == 0:
+            self._publish_policy()
+
+        model.logger.record("train/policy_gradient_loss", policy_loss.item())
+        model.logger.record("train/value_loss", value_loss.item())
+        model.logger.record("train/entropy_loss", entropy_loss.item())
+        model.logger.record("train/mean_rho", torch.exp(log_probs.detach() - behaviour_log_probs).mean().item())
+
+    def utilization(self):
+        """
+        Fraction of wall time each side spent doing work rather than waiting on the queue.
+        """
+        learner_total = self._learner_busy + self._learner_wait
+        actors = {}
+        for actor_id, (busy, wait) in sorted(self._actor_times.items()):
+            actors[actor_id] = busy / (busy + wait) if busy + wait > 0 else 0.0
+        return {
+            "learner": self._learner_busy / learner_total if learner_total > 0 else 0.0,
+            "actors": actors,
+            "actor_mean": float(np.mean(list(actors.values()))) if actors else 0.0,
+            "policy_lag": float(np.mean(self._policy_lag)) if self._policy_lag else 0.0,
+        }
+
+    def _record_utilization(self):
+        stats = self.utilization()
+        logger = self.model.logger
+        logger.record("async/learner_utilization", stats["learner"])
+        logger.record("async/actor_utilization", stats["actor_mean"])
+        logger.record("async/policy_lag", stats["policy_lag"])
+        for actor_id, value in stats["actors"].items():
+            logger.record(f"async/actor_{actor_id}_utilization", value)
+        logger.record("time/total_timesteps", self.model.num_timesteps)
+        logger.record("train/n_updates", self._n_updates)
+        if len(self.model.ep_info_buffer) > 0:
+            logger.record("rollout/ep_rew_mean", np.mean([ep["r"] for ep in self.model.ep_info_buffer]))
+            logger.record("rollout/ep_len_mean", np.mean([ep["l"] for ep in self.model.ep_info_buffer]))
+        logger.dump(step=self.model.num_timesteps)
+
+    def learn(self, map_type, total_timesteps, callback=None, reset_num_timesteps=False, tb_log_name="AsyncPPO",
+              env_kwargs=None):
+        """
+        Trains on `map_type` until `total_timesteps` env steps are consumed or a callback stops training.
+        Accepts the same SB3 callbacks as model.learn (curriculum threshold, checkpoints, transparency).
+        """
+        model = self.model
+        if reset_num_timesteps or model.ep_info_buffer is None:
+            model.ep_info_buffer = deque(maxlen=model._stats_window_size)
+        if reset_num_timesteps:
+            model.num_timesteps = 0
+        if not model._custom_logger:
+            model.set_logger(configure_logger(model.verbose, model.tensorboard_log, tb_log_name, reset_num_timesteps))
+
+        target_timesteps = model.num_timesteps + total_timesteps
+        callback = model._init_callback(callback, progress_bar=False)
+        callback.on_training_start(locals(), globals())
+
+        self._reset_utilization()
+        self._publish_policy()
+        self._start_actors(map_type, env_kwargs or {})
+        continue_training = True
+        try:
+            while continue_training and model.num_timesteps < target_timesteps:
+                # 1. Gather a batch of unrolls from whichever actors are ready
+                t_wait = time.perf_counter()
+                batch = [self._next_trajectory() for _ in range(self.batch_size)]
+                t_busy = time.perf_counter()
+                self._learner_wait += t_busy - t_wait
+
+                # 2. Replay the actor steps through the callbacks, as model.learn would
+                callback.on_rollout_start()
+                for traj in batch:
+                    self._actor_times[traj["actor_id"]] = (traj["busy_time"], traj["wait_time"])
+                    self._policy_lag.append(self._policy_version.value - traj["policy_version"])
+                    model.ep_info_buffer.extend(traj["episodes"])
+                    for info, done in zip(traj["infos"], traj["dones"]):
+                        model.num_timesteps += 1
+                        callback.update_locals({"infos": [info], "dones": np.array([bool(done)])})
+                        if not callback.on_step():
+                            continue_training = False
+                            break
+                    if not continue_training:
+                        break
+                callback.on_rollout_end()
+
+                # 3. Off-policy corrected update
+                if continue_training:
+                    self._update(batch)
+                self._learner_busy += time.perf_counter() - t_busy
+
+                if self.log_interval and self._n_updates % self.log_interval == 0:
+                    self._record_utilization()
+        finally:
+            self._stop_actors()
+            callback.on_training_end()
+
+        if self.verbose > 0:
+            stats = self.utilization()
+            print(f"⚙️  Utilization | Learner: {stats['learner']:.0%} | "
+                  f"Actors (mean): {stats['actor_mean']:.0%} | Policy lag: {stats['policy_lag']:.1f} updates")
+        return self
@@ -1,11 +1,21 @@
 from stable_baselines3 import PPO
 import torch
+from frame_stack import FrameStackDictRolloutBuffer
+from stable_baselines3.common.preprocessing import is_image_space_channels_first
 
-def get_ppo_agent(env, device="cpu", tensorboard_log="./logs/training"):
+def get_ppo_agent(env, device="cpu", tensorboard_log="./logs/training", frame_stack=1):
     """
     Initializes the PPO agent with a MultiInputPolicy (Sensor Fusion).
     This logic is simulator-agnostic and will remain the same for CARLA.
+    With frame_stack > 1 the rollout buffer keeps one semantic frame per step
+    and rebuilds the stacks per minibatch.
     """
+    buffer_kwargs = {}
+    if frame_stack > 1:
+        buffer_kwargs = dict(
+            rollout_buffer_class=FrameStackDictRolloutBuffer,
+            rollout_buffer_kwargs={"stack_key": "semantic"},
+        )
     model = PPO(
         "MultiInputPolicy", 
         env, 
@@ -13,7 +23,8 @@ def get_ppo_agent(env, device="cpu", tensorboard_log="./logs/training"):
         learning_rate=1e-3, # Turbo: Faster philosophy update
         device=device,
         stats_window_size=1, # Quicker reward reporting
-        tensorboard_log=tensorboard_log
+        tensorboard_log=tensorboard_log,
+        **buffer_kwargs
     )
     return model
 
@@ -24,3 +35,14 @@ def load_agent(path, env=None, device="cpu"):
     if env:
         return PPO.load(path, env=env, device=device)
     return PPO.load(path, device=device)
+
+def get_frame_stack(model):
+    """
+    Number of semantic frames per observation the model was trained with
+    (1 for models without a semantic key, which test.py reports as a mismatch).
+    """
+    spaces = getattr(model.observation_space, "spaces", {})
+    if "semantic" not in spaces:
+        return 1
+    space = spaces["semantic"]
+    return space.shape[0] if is_image_space_channels_first(space) else space.shape[-1]
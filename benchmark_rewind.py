@@ -0,0 +1,67 @@
+import os
+import argparse
+from agent_logic import get_frame_stack, get_ppo_agent, load_agent
+from curriculum_manager import RewardThresholdCallback, get_curriculum_config
+from env_wrapper import make_env
+
+def steps_to_clear(map_type, threshold, rewind_probability, max_timesteps, start_model=None, frame_stack=1):
+    """
+    Trains on `map_type` until the threshold is met on episodes driven from
+    the map origin, and returns (simulator steps used, cleared, rewinds taken).
+    """
+    env = make_env(render=False, map_type=map_type, rewind_probability=rewind_probability,
+                   frame_stack=frame_stack)
+    try:
+        if start_model and os.path.exists(start_model):
+            model = load_agent(start_model, env=env)
+        else:
+            model = get_ppo_agent(env, tensorboard_log=None, frame_stack=frame_stack)
+        model.verbose = 0
+
+        stop_callback = RewardThresholdCallback(threshold=threshold, verbose=0)
+        model.learn(total_timesteps=max_timesteps, callback=stop_callback, progress_bar=False)
+        rewinds = getattr(env, "gym_env", env).rewind_count
+        return model.num_timesteps, stop_callback.reached, rewinds
+    finally:
+        env.close()
+
+def run_benchmark(rewind_probability=0.5, runs=3, max_timesteps=200000, start_model="models/stage1_final.zip",
+                  frame_stack=1):
+    stage = get_curriculum_config()[-1]
+    print(f"=== Snapshot & Rewind Benchmark: {stage['name']} (Map: {stage['map']}, Goal: {stage['threshold']}) ===")
+    if os.path.exists(start_model):
+        # The start model fixes the observation layout
+        frame_stack = get_frame_stack(load_agent(start_model))
+        print(f"Starting every run from {start_model} (Frame stack: {frame_stack})")
+
+    results = {}
+    for probability in (0.0, rewind_probability):
+        label = "origin resets" if probability == 0.0 else f"rewind p={probability}"
+        results[label] = []
+        for run in range(runs):
+            steps, cleared, rewinds = steps_to_clear(stage['map'], stage['threshold'], probability,
+                                                     max_timesteps, start_model, frame_stack)
+            results[label].append(steps)
+            status = "✅ cleared" if cleared else "❌ budget exhausted"
+            print(f"  {label:16} run {run + 1}: {steps:7d} steps | {status} | rewinds: {rewinds}")
+
+    print("\n📊 Mean simulator steps to clear the stage:")
+    baseline = None
+    for label, steps in results.items():
+        mean_steps = sum(steps) / len(steps)
+        change = f" ({(mean_steps - baseline) / baseline:+.0%} vs origin resets)" if baseline else ""
+        print(f"  {label:16} {mean_steps:9.0f}{change}")
+        baseline = baseline or mean_steps
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure steps to clear the SCX stage with and without rewinds")
+    parser.add_argument("--rewind", type=float, default=0.5, help="Share of post-failure resets that rewind")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--max-steps", type=int, default=200000)
+    parser.add_argument("--start-model", default="models/stage1_final.zip")
+    parser.add_argument("--frame-stack", type=int, default=1,
+                        help="Semantic frames per observation when training from scratch")
+    args = parser.parse_args()
+    run_benchmark(rewind_probability=args.rewind, runs=args.runs, max_timesteps=args.max_steps,
+                  start_model=args.start_model, frame_stack=args.frame_stack)
@@ -1,3 +1,4 @@
+from collections import deque
 from stable_baselines3.common.callbacks import BaseCallback
 
 class RewardThresholdCallback(BaseCallback):
@@ -8,12 +9,35 @@ class RewardThresholdCallback(BaseCallback):
     def __init__(self, threshold, verbose=0):
         super(RewardThresholdCallback, self).__init__(verbose)
         self.threshold = threshold
+        self.origin_rewards = None
+        self.env_rewinds = False
+        self.reached = False
+
+    def _on_training_start(self) -> None:
+        self.origin_rewards = deque(maxlen=self.model._stats_window_size)
+
+    def _episode_rewards(self):
+        """
+        Rewound episodes start mid-map, so their returns are not comparable.
+        The env only adds info["rewound"] when rewinds are enabled; in that case
+        judge only origin-start episodes, otherwise use the Monitor episode buffer.
+        """
+        for info, done in zip(self.locals.get("infos", []), self.locals.get("dones", [])):
+            if "rewound" in info:
+                self.env_rewinds = True
+                if done and not info["rewound"]:
+                    self.origin_rewards.append(info["episode_reward"])
+        if self.env_rewinds:
+            return list(self.origin_rewards)
+        return [info['r'] for info in self.model.ep_info_buffer]
 
     def _on_step(self) -> bool:
-        if len(self.model.ep_info_buffer) > 0:
+        rewards = self._episode_rewards()
+        if len(rewards) > 0:
             # Calculate mean reward from the recent episodes
-            mean_reward = sum([info['r'] for info in self.model.ep_info_buffer]) / len(self.model.ep_info_buffer)
+            mean_reward = sum(rewards) / len(rewards)
             if mean_reward >= self.threshold:
+                self.reached = True
                 if self.verbose > 0:
                     print(f"\n[Curriculum] Threshold reached: {mean_reward:.2f} >= {self.threshold}")
                     print(f"[Curriculum] Transitioning to next stage...")
@@ -26,5 +50,5 @@ def get_curriculum_config():
     """
     return [
         {"name": "Stage 1: Straight Roads", "map": "S", "threshold": 50.0},
-        {"name": "Stage 2: Complex Scenarios", "map": "SCX", "threshold": 50.0}
+        {"name": "Stage 2: Complex Scenarios", "map": "SCX", "threshold": 50.0, "rewind_probability": 0.5}
     ]
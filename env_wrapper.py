@@ -60,6 +60,9 @@ except Exception as e:
 import gym
 from gym import spaces
 import numpy as np
+from collections import deque
+from frame_stack import LazyFrames
+from rewind_manager import RewindTracker
 from metadrive.envs.metadrive_env import MetaDriveEnv
 
 class SensorFusionEnv(MetaDriveEnv):
@@ -75,6 +78,12 @@ class SensorFusionEnv(MetaDriveEnv):
             "success_reward": 50.0,
             "use_lateral_reward": True,
             "yellow_line_penalty": 20.0,
+            # Snapshot & Rewind: restart a share of episodes just before the last failure
+            "snapshot_interval": 20,     # Steps between ego-state snapshots
+            "rewind_probability": 0.0,   # Share of resets after a failure that rewind (0 = off)
+            "rewind_lookback": 2,        # How many snapshots before the failure to rewind to
+            "rewind_max_retries": 3,     # Rewinds per failure point before falling back to origin
+            "frame_stack": 1,            # Semantic frames per observation (>1 = ring-buffered stack)
             "vehicle_config": {
                 "image_source": "semantic_camera",
                 "show_lidar": False,
@@ -92,8 +101,10 @@ class SensorFusionEnv(MetaDriveEnv):
         super(SensorFusionEnv, self).__init__(config)
         
         self.vec_space = super().observation_space
-        # Simplified 64x64 Space
-        self.semantics_space = spaces.Box(low=0, high=255, shape=(64, 64, 1), dtype=np.uint8)
+        # Simplified 64x64 Space (frame_stack channels of motion context)
+        self.frame_stack = max(1, self.config["frame_stack"])
+        self._frames = deque(maxlen=self.frame_stack)
+        self.semantics_space = spaces.Box(low=0, high=255, shape=(64, 64, self.frame_stack), dtype=np.uint8)
         
         # Turbo Mode: Semantic + Vector (ignore RGB/Depth for fast learning)
         self._custom_observation_space = spaces.Dict({
@@ -101,6 +112,18 @@ class SensorFusionEnv(MetaDriveEnv):
             "vector": self.vec_space
         })
 
+        self.rewinds = RewindTracker(
+            snapshot_interval=self.config["snapshot_interval"],
+            rewind_probability=self.config["rewind_probability"],
+            lookback=self.config["rewind_lookback"],
+            max_retries=self.config["rewind_max_retries"],
+        )
+        self._episode_reward = 0.0
+
+    @property
+    def rewind_count(self):
+        return self.rewinds.rewind_count
+
     @property
     def observation_space(self):
         if hasattr(self, '_custom_observation_space'):
@@ -108,6 +131,10 @@ class SensorFusionEnv(MetaDriveEnv):
         return super().observation_space
 
     def reset(self, *args, **kwargs):
+        point = self.rewinds.select_rewind_point()
+        if point is not None:
+            # Same seed -> same map and spawn, then teleport the ego vehicle
+            kwargs["force_seed"] = point["seed"]
         r = super(SensorFusionEnv, self).reset(*args, **kwargs)
         info = {}
         if isinstance(r, tuple):
@@ -115,7 +142,12 @@ class SensorFusionEnv(MetaDriveEnv):
         else:
             vec_obs = r
 
-        obs = self._get_onboard_observations(vec_obs)
+        self.rewinds.start_episode()
+        self._episode_reward = 0.0
+        if point is not None:
+            vec_obs = self._restore_snapshot(point, vec_obs)
+
+        obs = self._get_onboard_observations(vec_obs, new_episode=True)
         
         if isinstance(r, tuple):
             return obs, info
@@ -150,16 +182,72 @@ class SensorFusionEnv(MetaDriveEnv):
             else:
                 info["penalty_yellow_line"] = 0.0
 
+            if self.rewinds.on_step(done):
+                self.rewinds.add_snapshot(self._take_snapshot())
+
+        self._episode_reward += reward
+        # Only reported when rewinds are enabled, so consumers can tell the two modes apart
+        if self.rewinds.enabled:
+            info["rewound"] = self.rewinds.rewound_episode
+            if done:
+                info["episode_reward"] = self._episode_reward
+        if done:
+            failed = (info.get("crash_vehicle", False) or info.get("crash_object", False)
+                      or info.get("out_of_road", False) or info.get("on_yellow_line", False))
+            self.rewinds.record_episode_end(failed)
+
         obs = self._get_onboard_observations(vec_obs)
         return obs, reward, done, info
 
-    def _get_onboard_observations(self, vec_obs):
+    def _take_snapshot(self):
+        """
+        Captures the ego-vehicle kinematic state only. On rewind, traffic is
+        re-spawned from the map seed at its starting positions, not where it was
+        at snapshot time, so crash_vehicle failures are not replayed exactly.
+        """
+        return {
+            "seed": self.current_seed,
+            "step": self.rewinds.episode_step,
+            "position": np.array(self.vehicle.position, dtype=np.float64),
+            "heading": float(self.vehicle.heading_theta),
+            "velocity": np.array(self.vehicle.velocity, dtype=np.float64),
+        }
+
+    def _restore_snapshot(self, point, vec_obs):
+        """
+        Teleports the ego vehicle to a stored snapshot and re-observes.
+        Falls back to the origin observation if the simulator rejects the state.
+        """
+        try:
+            self.vehicle.set_position(point["position"])
+            self.vehicle.set_heading_theta(point["heading"])
+            self.vehicle.set_velocity(point["velocity"])
+            self.vehicle.navigation.update_localization(self.vehicle)
+            agent_id = next(iter(self.vehicles))
+            vec_obs = self.observations[agent_id].observe(self.vehicle)
+        except Exception as e:
+            print(f"DEBUG: Rewind failed, starting from origin: {e}")
+            return vec_obs
+        self.rewinds.mark_rewound(point)
+        return vec_obs
+
+    def _get_onboard_observations(self, vec_obs, new_episode=False):
         """
         Retrieves all onboard sensor data and packages it into a dict.
+        With frame stacking, 'semantic' is a LazyFrames view over the ring buffer,
+        so consecutive observations share frames instead of copying them.
         """
         images = self._get_sensor_images()
+        if self.frame_stack == 1:
+            semantic = images["semantic"]
+        else:
+            if new_episode:
+                self._frames.extend([images["semantic"]] * self.frame_stack)
+            else:
+                self._frames.append(images["semantic"])
+            semantic = LazyFrames(self._frames)
         return {
-            "semantic": images["semantic"],
+            "semantic": semantic,
             "vector": vec_obs
         }
 
@@ -187,10 +275,12 @@ class SensorFusionEnv(MetaDriveEnv):
 # Removed setup_engine to avoid invalid imports and because it was empty.
             
 # Helper function for SB3
-def make_env(render=False, map_type="SCX"):
+def make_env(render=False, map_type="SCX", rewind_probability=0.0, frame_stack=1):
     config = dict(
         use_render=render,
         map=map_type,
+        rewind_probability=rewind_probability,
+        frame_stack=frame_stack,
         vehicle_config=dict(
             semantic_camera=(64, 64),
         )
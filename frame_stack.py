@@ -0,0 +1,118 @@
+import numpy as np
+from stable_baselines3.common.buffers import DictRolloutBuffer
+from stable_baselines3.common.preprocessing import is_image_space_channels_first
+
+
+class LazyFrames:
+    """
+    Stacked view over the env's frame ring buffer.
+    Consecutive observations share the same frame arrays; the stacked array
+    is only built when numpy asks for it (e.g. when the VecEnv copies it in).
+    """
+    __slots__ = ("_frames",)
+
+    def __init__(self, frames):
+        self._frames = tuple(frames)
+
+    def __array__(self, dtype=None, copy=None):
+        out = np.concatenate(self._frames, axis=-1)
+        return out.astype(dtype) if dtype is not None else out
+
+    def __len__(self):
+        return self.shape[-1]
+
+    @property
+    def shape(self):
+        frame_shape = self._frames[0].shape
+        return frame_shape[:-1] + (frame_shape[-1] * len(self._frames),)
+
+    @property
+    def dtype(self):
+        return self._frames[0].dtype
+
+    def __getstate__(self):
+        return self._frames
+
+    def __setstate__(self, frames):
+        self._frames = frames
+
+
+class FrameStackDictRolloutBuffer(DictRolloutBuffer):
+    """
+    DictRolloutBuffer that stores only the newest frame of a stacked image key.
+    The frames preceding the rollout are kept once per env, and full stacks are
+    rebuilt per minibatch from the episode boundaries (matching the env, which
+    fills the stack with the first frame on reset).
+    """
+    def __init__(self, buffer_size, observation_space, action_space, *args, stack_key="semantic", **kwargs):
+        space = observation_space.spaces[stack_key]
+        self.stack_key = stack_key
+        self.stack_axis = 0 if is_image_space_channels_first(space) else len(space.shape) - 1
+        self.n_stack = space.shape[self.stack_axis]
+        self.stacked_shape = space.shape
+        self.frame_shape = tuple(1 if i == self.stack_axis else d for i, d in enumerate(space.shape))
+        self.frame_dtype = space.dtype
+        super(FrameStackDictRolloutBuffer, self).__init__(buffer_size, observation_space, action_space, *args, **kwargs)
+
+    def reset(self):
+        self.obs_shape[self.stack_key] = self.frame_shape
+        super(FrameStackDictRolloutBuffer, self).reset()
+        self.observations[self.stack_key] = np.zeros((self.buffer_size, self.n_envs) + self.frame_shape, dtype=self.frame_dtype)
+        # (n_envs, n_stack, *frame_shape): oldest -> newest frame of the first stored observation
+        self.prefix_frames = np.zeros((self.n_envs, self.n_stack) + self.frame_shape, dtype=self.frame_dtype)
+
+    def _split_frames(self, stacked):
+        return np.stack([np.take(stacked, [j], axis=self.stack_axis + 1) for j in range(self.n_stack)], axis=1)
+
+    def add(self, obs, *args, **kwargs):
+        stacked = np.asarray(obs[self.stack_key])
+        if self.pos == 0:
+            self.prefix_frames = self._split_frames(stacked).astype(self.frame_dtype)
+        obs = dict(obs)
+        obs[self.stack_key] = np.take(stacked, [self.n_stack - 1], axis=self.stack_axis + 1)
+        super(FrameStackDictRolloutBuffer, self).add(obs, *args, **kwargs)
+
+    def _stack_frames(self, batch_inds):
+        """
+        Materializes the stacked observations for one minibatch.
+        """
+        # After get(), observations are flattened env-major: index = env * buffer_size + step
+        frames = self.observations[self.stack_key].reshape((self.n_envs, self.buffer_size) + self.frame_shape)
+        env_inds, step_inds = np.divmod(batch_inds, self.buffer_size)
+
+        # Most recent episode start at or before each step (-n_stack when none in this rollout)
+        starts = np.where(self.episode_starts.astype(bool), np.arange(self.buffer_size)[:, None], -self.n_stack)
+        last_start = np.maximum.accumulate(starts, axis=0)[step_inds, env_inds]
+
+        stacked = []
+        for offset in range(self.n_stack - 1, -1, -1):
+            src = np.maximum(step_inds - offset, last_start)
+            frame = frames[env_inds, np.maximum(src, 0)]
+            before_rollout = src < 0
+            if before_rollout.any():
+                frame[before_rollout] = self.prefix_frames[env_inds[before_rollout], src[before_rollout] + self.n_stack - 1]
+            stacked.append(frame)
+        return np.concatenate(stacked, axis=self.stack_axis + 1)
+
+    def _get_samples(self, batch_inds, env=None):
+        samples = super(FrameStackDictRolloutBuffer, self)._get_samples(batch_inds, env)
+        samples.observations[self.stack_key] = self.to_torch(self._stack_frames(batch_inds))
+        return samples
+
+    def memory_usage(self):
+        """
+        Bytes held for the stacked key vs. a naive DictRolloutBuffer, which stores
+        every full stack in the space dtype.
+        """
+        stored = self.observations[self.stack_key].nbytes + self.prefix_frames.nbytes
+        naive = self.buffer_size * self.n_envs * int(np.prod(self.stacked_shape)) * np.dtype(self.frame_dtype).itemsize
+        return {"frame_stack_bytes": stored, "naive_stack_bytes": naive}
+
+
+def print_frame_stack_memory(buffer):
+    usage = buffer.memory_usage()
+    stored, naive = usage["frame_stack_bytes"], usage["naive_stack_bytes"]
+    line = (f"🎞️  FRAME STACK x{buffer.n_stack} | Rollout '{buffer.stack_key}': {stored / 1024 ** 2:6.1f} MB "
+            f"vs naive {naive / 1024 ** 2:6.1f} MB ({naive / max(stored, 1):.1f}x smaller)")
+    print(line)
+    return usage
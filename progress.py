@@ -1,8 +1,9 @@
 import os
 import glob
-from agent_logic import load_agent
+from agent_logic import get_frame_stack, load_agent
 from env_wrapper import make_env
 from metrics_logger import print_episode_summary, TransparencyCallback
+from resource_monitor import print_resource_summary, snapshot_resources
 
 def evaluate_milestone(model_path, env, num_episodes=5):
     """
@@ -59,9 +60,12 @@ def run_progress_analysis():
         print("💡 Ensure you have started training with Stage 1.")
         return
 
-    env = make_env(render=False, map_type="S") # Evaluate on Straight road (Stage 1)
+    # Milestones come from one run, so the first one tells the frame stack depth
+    frame_stack = get_frame_stack(load_agent(milestone_files[0]))
+    env = make_env(render=False, map_type="S", frame_stack=frame_stack) # Evaluate on Straight road (Stage 1)
     
     prev_total = None
+    start_resources = snapshot_resources()
     
     for file in milestone_files:
         steps = int(file.split("_")[-2])
@@ -78,6 +82,8 @@ def run_progress_analysis():
             print(f"📊 TREND: {trend} ({diff:+.2f} points vs previous milestone)")
         
         prev_total = total
+        # Each milestone loads a fresh model; growth here points to a leak in load_agent
+        print_resource_summary(start_resources, snapshot_resources(), title="RESOURCES")
 
     env.close()
     print("\n🏁 Progress analysis complete.")
@@ -0,0 +1,128 @@
+import gc
+import os
+import sys
+import numpy as np
+import torch
+from stable_baselines3.common.callbacks import BaseCallback
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _rss_mb():
+    if psutil is not None:
+        return psutil.Process(os.getpid()).memory_info().rss / 1024 ** 2
+    # Fallback: only the peak is available without psutil
+    return _peak_rss_mb()
+
+
+def _peak_rss_mb():
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KiB, macOS reports bytes
+        return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+    if psutil is not None:
+        info = psutil.Process(os.getpid()).memory_info()
+        return getattr(info, "peak_wset", info.rss) / 1024 ** 2
+    return 0.0
+
+
+def _panda3d_node_count():
+    """
+    Number of scene-graph nodes under the active MetaDrive engine.
+    0 means no engine is running; None means the count could not be read.
+    """
+    try:
+        from metadrive.engine.engine_utils import engine_initialized, get_engine
+        if not engine_initialized():
+            return 0
+        engine = get_engine()
+        return engine.render.countNumDescendants() + engine.render2d.countNumDescendants()
+    except Exception:
+        return None
+
+
+def _torch_tensor_count():
+    count = 0
+    for obj in gc.get_objects():
+        try:
+            if torch.is_tensor(obj):
+                count += 1
+        except Exception:
+            continue
+    return count
+
+
+def snapshot_resources():
+    """
+    One point-in-time reading of process memory and live object counts.
+    """
+    return {
+        "rss_mb": _rss_mb(),
+        "peak_rss_mb": _peak_rss_mb(),
+        "gc_objects": len(gc.get_objects()),
+        "torch_tensors": _torch_tensor_count(),
+        "panda3d_nodes": _panda3d_node_count(),
+    }
+
+
+def growth_per_cycle(values):
+    """
+    Least-squares slope of a series, i.e. average growth per sample.
+    """
+    if len(values) < 2:
+        return 0.0
+    return float(np.polyfit(np.arange(len(values)), np.asarray(values, dtype=np.float64), 1)[0])
+
+
+class ResourceTelemetryCallback(BaseCallback):
+    """
+    Records RSS, peak memory and open-object counts every `log_freq` steps
+    and once at the end of each stage (one callback instance per stage).
+    Readings go to the SB3 logger under `resources/` and are kept in `history`.
+    """
+    def __init__(self, stage_name="", log_freq=5000, verbose=1):
+        super(ResourceTelemetryCallback, self).__init__(verbose)
+        self.stage_name = stage_name
+        self.log_freq = log_freq
+        self.history = []
+        self.stage_start = None
+
+    def _record(self, tag):
+        snap = snapshot_resources()
+        snap["num_timesteps"] = self.num_timesteps
+        snap["tag"] = tag
+        self.history.append(snap)
+        for key in ("rss_mb", "peak_rss_mb", "gc_objects", "torch_tensors", "panda3d_nodes"):
+            if snap[key] is not None:
+                self.logger.record(f"resources/{key}", snap[key])
+        return snap
+
+    def _on_training_start(self) -> None:
+        self.stage_start = self._record("stage_start")
+
+    def _on_step(self) -> bool:
+        if self.log_freq > 0 and self.n_calls % self.log_freq == 0:
+            self._record("step")
+        return True
+
+    def _on_training_end(self) -> None:
+        end = self._record("stage_end")
+        if self.verbose > 0:
+            print_resource_summary(self.stage_start, end, title=self.stage_name or "STAGE")
+
+
+def print_resource_summary(start, end, title="STAGE"):
+    line = (f"🧠 {title} | RSS: {end['rss_mb']:7.1f} MB ({end['rss_mb'] - start['rss_mb']:+.1f}) | "
+            f"Peak: {end['peak_rss_mb']:7.1f} MB | "
+            f"Tensors: {end['torch_tensors']} ({end['torch_tensors'] - start['torch_tensors']:+d}) | "
+            f"Nodes: {end['panda3d_nodes']} | GC objs: {end['gc_objects'] - start['gc_objects']:+d}")
+    print(line)
+    return line
@@ -0,0 +1,86 @@
+from collections import deque
+import numpy as np
+
+class RewindTracker:
+    """
+    Simulator-agnostic bookkeeping for snapshot-and-rewind resets.
+    The env takes and restores the actual snapshots; this class decides when
+    to snapshot, which snapshot becomes the rewind point after a failure,
+    and whether the next reset should rewind to it.
+    """
+    def __init__(self, snapshot_interval=20, rewind_probability=0.0, lookback=2, max_retries=3, rng=None):
+        self.snapshot_interval = snapshot_interval
+        self.rewind_probability = rewind_probability
+        self.max_retries = max_retries
+        self.rng = rng if rng is not None else np.random
+        self.snapshots = deque(maxlen=max(1, lookback))
+        self.point = None
+        self.retries = 0
+        self.rewound_episode = False
+        self.episode_step = 0
+        self.rewind_count = 0
+
+    @property
+    def enabled(self):
+        return self.rewind_probability > 0 and self.snapshot_interval > 0
+
+    def start_episode(self):
+        self.snapshots.clear()
+        self.episode_step = 0
+        self.rewound_episode = False
+
+    def mark_rewound(self, point):
+        """
+        Called once the env has restored `point`; the episode continues from its step.
+        """
+        self.episode_step = point["step"]
+        self.rewound_episode = True
+        self.rewind_count += 1
+
+    def on_step(self, done):
+        """
+        Advances the step counter and returns True when a snapshot is due.
+        The final step of an episode is never snapshotted: on a failure that
+        state is the crash itself and would be a useless rewind target.
+        """
+        self.episode_step += 1
+        return self.enabled and not done and self.episode_step % self.snapshot_interval == 0
+
+    def add_snapshot(self, snapshot):
+        self.snapshots.append(snapshot)
+
+    def record_episode_end(self, failed):
+        """
+        On a failure, remember the snapshot taken shortly before it as the next rewind target.
+        """
+        if failed and len(self.snapshots) > 0:
+            point = self.snapshots[0]
+            if self.point is None or point["seed"] != self.point["seed"] \
+                    or abs(point["step"] - self.point["step"]) >= self.snapshot_interval:
+                self.retries = 0
+            self.point = point
+        elif failed:
+            # Failed before the first snapshot: nothing earlier to rewind to in this
+            # episode. A rewound episode keeps retrying its own point (same seed);
+            # an origin episode drops any older point, which may belong to another seed.
+            if not self.rewound_episode:
+                self.point = None
+                self.retries = 0
+        else:
+            # Segment cleared (or timed out): go back to normal origin starts
+            self.point = None
+            self.retries = 0
+
+    def select_rewind_point(self):
+        """
+        Returns the snapshot the next reset should rewind to, or None for an origin start.
+        """
+        if self.point is None or not self.enabled:
+            return None
+        if self.retries >= self.max_retries:
+            self.point = None
+            return None
+        if self.rng.random() >= self.rewind_probability:
+            return None
+        self.retries += 1
+        return self.point
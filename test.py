@@ -1,5 +1,5 @@
 import os
-from agent_logic import load_agent
+from agent_logic import get_frame_stack, load_agent
 from env_wrapper import make_env
 
 def test():
@@ -31,8 +31,9 @@ def test():
         print(f"❌ Failed to load model: {e}")
         return
     
-    print("🌍 Creating environment (Map: SCX)...")
-    env = make_env(render=True, map_type="SCX")
+    frame_stack = get_frame_stack(model)
+    print(f"🌍 Creating environment (Map: SCX, Frame stack: {frame_stack})...")
+    env = make_env(render=True, map_type="SCX", frame_stack=frame_stack)
     
     print("▶️ Starting simulation. Press Ctrl+C to stop.")
     obs, info = env.reset()
@@ -0,0 +1,107 @@
+import time
+
+import numpy as np
+import gymnasium as gym
+import torch
+from gymnasium import spaces
+from stable_baselines3 import PPO
+from stable_baselines3.common.logger import configure
+
+from actor_learner import AsyncActorLearner, collect_unroll, vtrace
+
+
+class FakeSensorEnv(gym.Env):
+    """
+    Same observation layout as SensorFusionEnv: channel-last uint8 image + vector.
+    """
+    def __init__(self):
+        self.observation_space = spaces.Dict({
+            "semantic": spaces.Box(low=0, high=255, shape=(64, 64, 1), dtype=np.uint8),
+            "vector": spaces.Box(low=-1.0, high=1.0, shape=(5,), dtype=np.float32),
+        })
+        self.action_space = spaces.Box(low=-1.0, high=1.0, shape=(2,), dtype=np.float32)
+        self.t = 0
+
+    def reset(self, seed=None, options=None):
+        super().reset(seed=seed)
+        self.t = 0
+        return self.observation_space.sample(), {}
+
+    def step(self, action):
+        self.t += 1
+        return self.observation_space.sample(), 1.0, self.t % 5 == 0, False, {}
+
+
+def discounted_returns(rewards, dones, bootstrap_value, gamma):
+    """
+    Plain bootstrapped returns, cut at episode ends.
+    """
+    ret = bootstrap_value.clone()
+    returns = []
+    for t in reversed(range(rewards.shape[0])):
+        ret = rewards[t] + gamma * (1.0 - dones[t]) * ret
+        returns.append(ret)
+    return torch.stack(returns[::-1])
+
+
+def test_vtrace_on_policy_matches_discounted_returns():
+    torch.manual_seed(0)
+    T, B, gamma = 6, 3, 0.9
+    rewards, values, bootstrap_value = torch.rand(T, B), torch.rand(T, B), torch.rand(B)
+    log_probs = torch.randn(T, B)
+
+    for dones in (torch.zeros(T, B), torch.zeros(T, B).index_fill_(0, torch.tensor([2]), 1.0)):
+        vs, pg_advantages = vtrace(log_probs, log_probs, rewards, values, bootstrap_value, dones, gamma)
+        expected = discounted_returns(rewards, dones, bootstrap_value, gamma)
+        assert torch.allclose(vs, expected, atol=1e-6)
+
+        vs_tp1 = torch.cat([expected[1:], bootstrap_value.unsqueeze(0)])
+        assert torch.allclose(pg_advantages, rewards + gamma * (1.0 - dones) * vs_tp1 - values, atol=1e-6)
+
+
+def test_vtrace_clips_importance_weights():
+    T, B, gamma = 4, 1, 0.5
+    rewards = torch.ones(T, B)
+    values = torch.zeros(T, B)
+    bootstrap_value = torch.zeros(B)
+    dones = torch.zeros(T, B)
+    behaviour = torch.zeros(T, B)
+    # rho = 4 everywhere: clipped to 1 by rho_bar/c_bar, so targets equal the on-policy returns
+    target = torch.full((T, B), np.log(4.0))
+
+    vs, pg_advantages = vtrace(behaviour, target, rewards, values, bootstrap_value, dones, gamma)
+    expected = discounted_returns(rewards, dones, bootstrap_value, gamma)
+    assert torch.allclose(vs, expected, atol=1e-6)
+
+    # rho = 0.25 everywhere: below the clip, so each TD error is scaled by 0.25
+    target = torch.full((T, B), np.log(0.25))
+    vs, _ = vtrace(behaviour, target, rewards, values, bootstrap_value, dones, gamma, rho_bar=1.0, c_bar=1.0)
+    acc, manual = 0.0, []
+    for t in reversed(range(T)):
+        acc = 0.25 * 1.0 + gamma * 0.25 * acc
+        manual.append(acc)
+    assert torch.allclose(vs[:, 0], torch.tensor(manual[::-1]), atol=1e-6)
+
+
+def test_update_accepts_channel_last_image_unrolls():
+    env = FakeSensorEnv()
+    model = PPO("MultiInputPolicy", env, n_steps=16, batch_size=16, verbose=0)
+    model.set_logger(configure(None, []))
+    assert model.policy.observation_space["semantic"].shape == (1, 64, 64)
+
+    trainer = AsyncActorLearner(model, unroll_length=8, batch_size=2)
+    obs, _ = env.reset()
+    episode = {"r": 0.0, "l": 0, "start": time.time()}
+    batch = []
+    for _ in range(trainer.batch_size):
+        unroll, obs = collect_unroll(env, model.policy, obs, trainer.unroll_length, episode)
+        batch.append(unroll)
+    assert batch[0]["obs"]["semantic"].shape == (trainer.unroll_length + 1, 64, 64, 1)
+    before = {k: v.clone() for k, v in model.policy.state_dict().items()}
+
+    trainer._update(batch)
+
+    assert trainer._n_updates == 1
+    assert trainer._policy_version.value == 1
+    after = model.policy.state_dict()
+    assert any(not torch.equal(before[k], after[k]) for k in before)
@@ -0,0 +1,51 @@
+from collections import deque
+from types import SimpleNamespace
+
+from curriculum_manager import RewardThresholdCallback
+
+
+def _callback(ep_rewards, window=3, threshold=10.0):
+    callback = RewardThresholdCallback(threshold=threshold)
+    callback.model = SimpleNamespace(_stats_window_size=window,
+                                     ep_info_buffer=deque({"r": r} for r in ep_rewards))
+    callback._on_training_start()
+    return callback
+
+
+def test_without_rewind_info_uses_monitor_buffer():
+    callback = _callback([4.0, 8.0])
+    callback.locals = {"infos": [{}], "dones": [True]}
+    assert callback._episode_rewards() == [4.0, 8.0]
+
+
+def test_with_rewind_info_only_origin_episodes_count():
+    callback = _callback([100.0])
+    steps = [
+        ({"rewound": False}, False),
+        ({"rewound": True, "episode_reward": 90.0}, True),
+        ({"rewound": False, "episode_reward": 5.0}, True),
+    ]
+    for info, done in steps:
+        callback.locals = {"infos": [info], "dones": [done]}
+        rewards = callback._episode_rewards()
+    # Rewound (90) and Monitor (100) returns are both ignored
+    assert rewards == [5.0]
+
+
+def test_rewound_episodes_do_not_trigger_threshold():
+    callback = _callback([100.0], threshold=50.0)
+    callback.locals = {"infos": [{"rewound": True, "episode_reward": 90.0}], "dones": [True]}
+    assert callback._on_step() is True
+    assert not callback.reached
+
+    callback.locals = {"infos": [{"rewound": False, "episode_reward": 60.0}], "dones": [True]}
+    assert callback._on_step() is False
+    assert callback.reached
+
+
+def test_origin_window_follows_stats_window_size():
+    callback = _callback([], window=2)
+    for reward in (1.0, 2.0, 3.0):
+        callback.locals = {"infos": [{"rewound": False, "episode_reward": reward}], "dones": [True]}
+        rewards = callback._episode_rewards()
+    assert rewards == [2.0, 3.0]
@@ -0,0 +1,102 @@
+from collections import deque
+
+import numpy as np
+import pytest
+import torch
+from gymnasium import spaces
+
+from frame_stack import FrameStackDictRolloutBuffer, LazyFrames
+
+N_STACK = 3
+BUFFER_SIZE = 7
+
+
+class FakeStackingEnvs:
+    """
+    n_envs episodic frame sources that stack like SensorFusionEnv: the ring is
+    filled with the first frame on reset. Episode ends follow a fixed schedule.
+    """
+    def __init__(self, n_envs, channels_first, episode_lengths):
+        self.n_envs = n_envs
+        self.channels_first = channels_first
+        self.episode_lengths = episode_lengths
+        self.counter = 0
+        self.rings = [deque(maxlen=N_STACK) for _ in range(n_envs)]
+        self.steps = [0] * n_envs
+        for env in range(n_envs):
+            self._reset(env)
+
+    def _frame(self):
+        self.counter += 1
+        return np.full((4, 4, 1), self.counter % 256, dtype=np.uint8)
+
+    def _reset(self, env):
+        self.rings[env].extend([self._frame()] * N_STACK)
+        self.steps[env] = 0
+
+    def stacked(self):
+        stacks = np.stack([np.asarray(LazyFrames(ring)) for ring in self.rings])
+        return np.moveaxis(stacks, -1, 1) if self.channels_first else stacks
+
+    def step(self):
+        """
+        Advances every env; returns the episode_start flags for the new observation.
+        """
+        starts = np.zeros(self.n_envs, dtype=np.float32)
+        for env in range(self.n_envs):
+            self.steps[env] += 1
+            if self.steps[env] >= self.episode_lengths[env]:
+                self._reset(env)
+                starts[env] = 1.0
+            else:
+                self.rings[env].append(self._frame())
+        return starts
+
+
+def _make_buffer(n_envs, channels_first):
+    shape = (N_STACK, 4, 4) if channels_first else (4, 4, N_STACK)
+    observation_space = spaces.Dict({
+        "semantic": spaces.Box(low=0, high=255, shape=shape, dtype=np.uint8),
+        "vector": spaces.Box(low=-1.0, high=1.0, shape=(2,), dtype=np.float32),
+    })
+    action_space = spaces.Box(low=-1.0, high=1.0, shape=(1,), dtype=np.float32)
+    return FrameStackDictRolloutBuffer(BUFFER_SIZE, observation_space, action_space, n_envs=n_envs)
+
+
+@pytest.mark.parametrize("channels_first", [False, True])
+@pytest.mark.parametrize("n_envs", [1, 3])
+def test_stack_frames_matches_added_observations(n_envs, channels_first):
+    buffer = _make_buffer(n_envs, channels_first)
+    # Env 0 resets mid-rollout; longer episodes carry into the next rollout
+    envs = FakeStackingEnvs(n_envs, channels_first, episode_lengths=[3, 5, 11][:n_envs])
+    episode_starts = np.ones(n_envs, dtype=np.float32)
+
+    for _ in range(3):
+        buffer.reset()
+        added = []
+        for _ in range(BUFFER_SIZE):
+            stacked = envs.stacked()
+            added.append(stacked)
+            buffer.add(
+                {"semantic": stacked, "vector": np.zeros((n_envs, 2), dtype=np.float32)},
+                np.zeros((n_envs, 1), dtype=np.float32),
+                np.zeros(n_envs, dtype=np.float32),
+                episode_starts,
+                torch.zeros(n_envs, 1),
+                torch.zeros(n_envs),
+            )
+            episode_starts = envs.step()
+        buffer.compute_returns_and_advantage(torch.zeros(n_envs, 1), episode_starts)
+        next(buffer.get(batch_size=BUFFER_SIZE * n_envs))
+
+        # get() flattens env-major: index = env * buffer_size + step
+        expected = np.stack(added, axis=1).reshape((n_envs * BUFFER_SIZE,) + added[0].shape[1:])
+        rebuilt = buffer._stack_frames(np.arange(n_envs * BUFFER_SIZE))
+        np.testing.assert_array_equal(rebuilt, expected)
+
+
+def test_memory_usage_compares_against_space_dtype():
+    buffer = _make_buffer(n_envs=2, channels_first=True)
+    usage = buffer.memory_usage()
+    assert usage["naive_stack_bytes"] == BUFFER_SIZE * 2 * N_STACK * 4 * 4
+    assert usage["frame_stack_bytes"] == (BUFFER_SIZE + N_STACK) * 2 * 4 * 4
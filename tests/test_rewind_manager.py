@@ -0,0 +1,103 @@
+from rewind_manager import RewindTracker
+
+
+class FixedRng:
+    def __init__(self, value):
+        self.value = value
+
+    def random(self):
+        return self.value
+
+
+def _drive(tracker, steps, seed=0, failed=None):
+    """
+    Runs one episode of `steps` env steps; the last step ends it with `failed`.
+    """
+    for i in range(steps):
+        done = failed is not None and i == steps - 1
+        if tracker.on_step(done):
+            tracker.add_snapshot({"seed": seed, "step": tracker.episode_step})
+    if failed is not None:
+        tracker.record_episode_end(failed)
+
+
+def _tracker(**kwargs):
+    params = dict(snapshot_interval=10, rewind_probability=1.0, lookback=2, max_retries=3, rng=FixedRng(0.0))
+    params.update(kwargs)
+    tracker = RewindTracker(**params)
+    tracker.start_episode()
+    return tracker
+
+
+def test_failure_rewinds_to_lookback_snapshot():
+    tracker = _tracker()
+    _drive(tracker, 35, failed=True)
+    # Snapshots at 10, 20, 30 -> lookback 2 keeps (20, 30); the older one is the target
+    assert tracker.point["step"] == 20
+    assert tracker.select_rewind_point()["step"] == 20
+    assert tracker.retries == 1
+
+
+def test_final_step_is_not_snapshotted():
+    tracker = _tracker(lookback=1)
+    # Failure lands exactly on a snapshot step: the crash state must not become the target
+    _drive(tracker, 30, failed=True)
+    assert tracker.point["step"] == 20
+
+
+def test_success_clears_rewind_point():
+    tracker = _tracker()
+    _drive(tracker, 35, failed=True)
+    tracker.start_episode()
+    _drive(tracker, 35, failed=False)
+    assert tracker.point is None
+    assert tracker.select_rewind_point() is None
+
+
+def test_origin_failure_before_first_snapshot_drops_stale_point():
+    tracker = _tracker()
+    _drive(tracker, 35, seed=1, failed=True)
+    assert tracker.point["seed"] == 1
+
+    tracker.start_episode()
+    _drive(tracker, 5, seed=2, failed=True)
+    assert tracker.point is None
+
+
+def test_rewound_failure_before_first_snapshot_keeps_point():
+    tracker = _tracker()
+    _drive(tracker, 35, failed=True)
+    point = tracker.select_rewind_point()
+    tracker.start_episode()
+    tracker.mark_rewound(point)
+    # Crashes again within one interval of the rewind point
+    for _ in range(3):
+        tracker.on_step(False)
+    tracker.record_episode_end(True)
+    assert tracker.point is point
+    assert tracker.rewind_count == 1
+
+
+def test_retries_are_capped():
+    tracker = _tracker(max_retries=2)
+    _drive(tracker, 35, failed=True)
+    assert tracker.select_rewind_point() is not None
+    assert tracker.select_rewind_point() is not None
+    assert tracker.select_rewind_point() is None
+    assert tracker.point is None
+
+
+def test_probability_gates_rewinds():
+    tracker = _tracker(rewind_probability=0.5, rng=FixedRng(0.7))
+    _drive(tracker, 35, failed=True)
+    assert tracker.select_rewind_point() is None
+    assert tracker.retries == 0
+    tracker.rng = FixedRng(0.2)
+    assert tracker.select_rewind_point() is not None
+
+
+def test_disabled_tracker_never_snapshots_or_rewinds():
+    tracker = _tracker(rewind_probability=0.0)
+    _drive(tracker, 35, failed=True)
+    assert len(tracker.snapshots) == 0
+    assert tracker.select_rewind_point() is None
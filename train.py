@@ -1,16 +1,20 @@
 import os
+import argparse
 import torch
 from agent_logic import get_ppo_agent
 from curriculum_manager import RewardThresholdCallback, get_curriculum_config
 from env_wrapper import make_env
 from stable_baselines3.common.callbacks import CheckpointCallback
 from metrics_logger import TransparencyCallback
+from resource_monitor import ResourceTelemetryCallback, print_resource_summary, snapshot_resources
+from frame_stack import print_frame_stack_memory
 
-def train():
+def train(frame_stack=1):
     """
     Main training orchestrator.
     Now modularized to demonstrate the Phase 1 (MetaDrive) setup
     which will be migrated to Phase 2 (CARLA) with minimal changes.
+    Set frame_stack > 1 to give the policy motion context.
     """
     os.makedirs("models", exist_ok=True)
     os.makedirs("logs", exist_ok=True)
@@ -20,6 +24,9 @@ def train():
     
     stages = get_curriculum_config()
     model = None
+    # Run-level baseline: per-stage telemetry only sees its own stage, so memory
+    # kept after an engine teardown shows up as growth against this reading
+    run_start = snapshot_resources()
 
     try:
         for i, stage in enumerate(stages):
@@ -27,11 +34,15 @@ def train():
             print(f"\n🚀 {stage['name']} (Map: {stage['map']})")
             
             # 1. Initialize/Switch Environment (Wrapped)
-            env = make_env(render=False, map_type=stage['map'])
+            env = make_env(render=False, map_type=stage['map'],
+                           rewind_probability=stage.get('rewind_probability', 0.0),
+                           frame_stack=frame_stack)
             
             # 2. Get/Update Agent (Simulator-Agnostic)
             if model is None:
-                model = get_ppo_agent(env, device=device)
+                model = get_ppo_agent(env, device=device, frame_stack=frame_stack)
+                if frame_stack > 1:
+                    print_frame_stack_memory(model.rollout_buffer)
             else:
                 model.set_env(env)
             
@@ -44,12 +55,13 @@ def train():
             )
             stop_callback = RewardThresholdCallback(threshold=stage['threshold'], verbose=1)
             transparency_callback = TransparencyCallback()
+            telemetry_callback = ResourceTelemetryCallback(stage_name=f"STAGE {stage_num}")
             
             # 4. Train
             print(f"Training Stage {stage_num} (Goal: {stage['threshold']} reward)...")
             model.learn(
                 total_timesteps=20000 if stage_num == 1 else 50000, 
-                callback=[checkpoint_callback, stop_callback, transparency_callback], 
+                callback=[checkpoint_callback, stop_callback, transparency_callback, telemetry_callback], 
                 progress_bar=False,
                 reset_num_timesteps=False # Maintain progress across stages
             )
@@ -57,6 +69,7 @@ def train():
             # 5. Save Progress
             model.save(f"models/stage{stage_num}_final")
             env.close()
+            print_resource_summary(run_start, snapshot_resources(), title=f"STAGE {stage_num} AFTER CLOSE")
             print(f"✅ Stage {stage_num} Complete.")
 
         model.save("models/final_model")
@@ -72,4 +85,7 @@ def train():
             env.close()
 
 if __name__ == "__main__":
-    train()
+    parser = argparse.ArgumentParser(description="Curriculum PPO training")
+    parser.add_argument("--frame-stack", type=int, default=1, help="Semantic frames per observation (>1 enables stacking)")
+    args = parser.parse_args()
+    train(frame_stack=args.frame_stack)
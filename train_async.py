@@ -0,0 +1,82 @@
+import os
+import argparse
+from actor_learner import AsyncActorLearner
+from agent_logic import get_ppo_agent
+from curriculum_manager import RewardThresholdCallback, get_curriculum_config
+from env_wrapper import make_env
+from stable_baselines3.common.callbacks import CheckpointCallback
+from metrics_logger import TransparencyCallback
+from resource_monitor import ResourceTelemetryCallback
+
+def train_async(num_actors=4, unroll_length=64, batch_size=4, queue_size=8):
+    """
+    Asynchronous actor-learner variant of train.py.
+    Actors keep stepping SensorFusionEnv while the learner applies
+    V-trace corrected updates, so neither side waits on the other.
+    """
+    os.makedirs("models", exist_ok=True)
+    os.makedirs("logs", exist_ok=True)
+
+    device = "cpu"
+    print(f"=== Starting Async Actor-Learner Training (Device: {device}, Actors: {num_actors}) ===")
+
+    stages = get_curriculum_config()
+
+    # The learner process never steps the simulator: this env only provides
+    # the observation/action spaces (MetaDrive starts its engine lazily on reset).
+    spaces_env = make_env(render=False, map_type=stages[0]['map'])
+    model = get_ppo_agent(spaces_env, device=device)
+    spaces_env.close()
+
+    trainer = AsyncActorLearner(
+        model,
+        num_actors=num_actors,
+        unroll_length=unroll_length,
+        batch_size=batch_size,
+        queue_size=queue_size,
+    )
+
+    try:
+        for i, stage in enumerate(stages):
+            stage_num = i + 1
+            print(f"\n🚀 {stage['name']} (Map: {stage['map']})")
+
+            checkpoint_path = "./models/milestones" if stage_num == 1 else f"./models/checkpoints_stage{stage_num}"
+            checkpoint_callback = CheckpointCallback(
+                save_freq=4000 if stage_num == 1 else 50000,
+                save_path=checkpoint_path,
+                name_prefix=f"milestone" if stage_num == 1 else f"stage{stage_num}_model"
+            )
+            stop_callback = RewardThresholdCallback(threshold=stage['threshold'], verbose=1)
+            transparency_callback = TransparencyCallback()
+            telemetry_callback = ResourceTelemetryCallback(stage_name=f"STAGE {stage_num}")
+
+            print(f"Training Stage {stage_num} (Goal: {stage['threshold']} reward)...")
+            trainer.learn(
+                map_type=stage['map'],
+                env_kwargs={"rewind_probability": stage.get('rewind_probability', 0.0)},
+                total_timesteps=20000 if stage_num == 1 else 50000,
+                callback=[checkpoint_callback, stop_callback, transparency_callback, telemetry_callback],
+                reset_num_timesteps=False
+            )
+
+            model.save(f"models/stage{stage_num}_final")
+            print(f"✅ Stage {stage_num} Complete.")
+
+        model.save("models/final_model")
+        print("\n🏁 Async curriculum training complete. Final model saved in ./models/final_model")
+
+    except KeyboardInterrupt:
+        print("\n⚠️ Training interrupted by user.")
+        save_path = "models/interrupted_model"
+        model.save(save_path)
+        print(f"💾 Progress saved to {save_path}.zip")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Asynchronous actor-learner (IMPALA/V-trace) training")
+    parser.add_argument("--actors", type=int, default=4, help="Number of actor processes")
+    parser.add_argument("--unroll", type=int, default=64, help="Steps per actor trajectory")
+    parser.add_argument("--batch", type=int, default=4, help="Trajectories per learner update")
+    parser.add_argument("--queue", type=int, default=8, help="Max trajectories buffered between actors and learner")
+    args = parser.parse_args()
+    train_async(num_actors=args.actors, unroll_length=args.unroll, batch_size=args.batch, queue_size=args.queue)
@@ -5,6 +5,7 @@ from curriculum_manager import get_curriculum_config
 from env_wrapper import make_env
 from stable_baselines3.common.callbacks import BaseCallback, CallbackList
 from metrics_logger import TransparencyCallback
+from resource_monitor import ResourceTelemetryCallback, print_resource_summary, snapshot_resources
 
 class RenderingCallback(BaseCallback):
     """
@@ -36,6 +37,9 @@ def train_visual():
     stages = get_curriculum_config()
     render_callback = RenderingCallback()
     model = None
+    # Run-level baseline: per-stage telemetry only sees its own stage, so memory
+    # kept after an engine teardown shows up as growth against this reading
+    run_start = snapshot_resources()
 
     for i, stage in enumerate(stages):
         stage_num = i + 1
@@ -43,7 +47,8 @@ def train_visual():
         
         try:
             # 1. Create Env with Rendering
-            env = make_env(render=True, map_type=stage['map'])
+            env = make_env(render=True, map_type=stage['map'],
+                           rewind_probability=stage.get('rewind_probability', 0.0))
             
             # 2. Setup Agent
             if model is None:
@@ -54,12 +59,14 @@ def train_visual():
             # 3. Learn (Short bursts for visual demo)
             print(f"Watch the engine learn in the 3D window...")
             transparency_callback = TransparencyCallback()
-            callbacks = CallbackList([render_callback, transparency_callback])
+            telemetry_callback = ResourceTelemetryCallback(stage_name=f"STAGE {stage_num}")
+            callbacks = CallbackList([render_callback, transparency_callback, telemetry_callback])
             model.learn(total_timesteps=10000, callback=callbacks, progress_bar=False)
             
             # 4. Save
             model.save(f"models/stage{stage_num}_visual")
             env.close()
+            print_resource_summary(run_start, snapshot_resources(), title=f"STAGE {stage_num} AFTER CLOSE")
         except KeyboardInterrupt:
             print("\n🛑 Visual training stopped by user.")
             break